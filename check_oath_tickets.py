@@ -6,11 +6,14 @@ This script queries the NYC DSNY Sanitation OATH database for
 violations associated with a specific address (1407 Overing Street by
 default) and sends an email whenever new tickets are detected.  It is
 designed to be run periodically by a GitHub Actions workflow.  On the
-first run, it will create a ``known_tickets.json`` file in the
-repository directory containing the ticket numbers that were present
-when the script executed.  Subsequent runs compare the set of
+first run, it will create a ``known_tickets.txt`` file in the
+repository directory listing, one per line, the ticket numbers that
+were present when the script executed.  Subsequent runs compare the set of
 previously‑seen ticket numbers against the latest records and only
-send an email when new tickets appear.
+send an email when new tickets appear.  The HTTP ``ETag`` and
+``Last-Modified`` headers of each response are kept in ``etag.json`` so
+that later runs can make conditional requests and skip downloading the
+results when nothing has changed.
 
 Configuration
 ~~~~~~~~~~~~~
@@ -20,11 +23,16 @@ variables.  These variables should be defined as GitHub secrets when
 the workflow is set up:
 
 * ``SMTP_SERVER`` – hostname of the SMTP server (e.g. ``smtp.gmail.com``)
-* ``SMTP_PORT`` – port number for the SMTP server (typically ``587``)
+* ``SMTP_PORT`` – port number for the SMTP server (defaults to ``587``)
 * ``SMTP_USERNAME`` – username for authenticating to the SMTP server
 * ``SMTP_PASSWORD`` – password or app‑specific password for the SMTP account
 * ``FROM_EMAIL`` – email address used in the ``From`` field of outbound messages
 * ``TO_EMAIL`` – email address that should receive notification messages
+* ``OATH_MIN_INTERVAL_SECONDS`` – minimum number of seconds between two
+  queries of the dataset (default ``0``, i.e. disabled); runs that start
+  sooner exit without contacting the API.  Only useful when the workflow
+  is scheduled more often than the desired check frequency, e.g. an
+  hourly cron with ``82800`` (23 hours) for daily checks.
 
 The repository should include this script (e.g. in a ``scripts``
 directory) and a GitHub Actions workflow can call it on a schedule.
@@ -38,14 +46,42 @@ recommended.  Daily checks are usually sufficient for tracking new
 cases.
 """
 
+import hashlib
+import io
 import json
 import os
+import re
 import smtplib
-from email.mime.text import MIMEText
+import time
+from dataclasses import dataclass, field
+from email.message import EmailMessage
+from functools import cache, lru_cache
 from pathlib import Path
-from typing import Iterable, List, Dict, Set
+from typing import Iterable, List, Dict, Optional, Set, Tuple
+from urllib.parse import quote_plus, urlencode
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:  # orjson is optional; fall back to the standard library when absent
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _json_loads(data: bytes):
+    """Decode JSON from raw UTF‑8 bytes, preferring ``orjson`` when installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(obj) -> bytes:
+    """Encode ``obj`` as indented UTF‑8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode("utf-8")
 
 # Address details
 #
@@ -61,32 +97,47 @@ import requests
 ADDRESS_HOUSE = os.environ.get("OATH_ADDRESS_HOUSE", "1407")
 ADDRESS_STREET = os.environ.get("OATH_ADDRESS_STREET", "OVERING STREET")
 
+# Minimum time between two successful queries; ``0`` disables the check.
+# The time of the last successful query is stored in ``last_fetch.txt``
+# rather than inferred from a file's mtime, because a fresh checkout
+# resets every mtime.  The file is only written while the check is on.
+MIN_INTERVAL_SECONDS = int(os.environ.get("OATH_MIN_INTERVAL_SECONDS", "0"))
+
+
+# Separators between entries of ``TICKET_ADDRESSES`` and runs of
+# whitespace inside an entry.
+_ADDRESS_SEP_RE = re.compile(r"[;\n]+")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+@cache
 def parse_addresses() -> List[Dict[str, str]]:
     """Parse the configured addresses from the environment.
 
     Returns a list of dictionaries with ``house`` and ``street`` keys.
     When ``TICKET_ADDRESSES`` is defined, it is split on semicolons
     and newlines to produce individual address strings.  Each address
-    string is split on whitespace; the first token is taken as the
-    house number and the remainder (joined back together) is treated as
-    the street name.  If no multi‑address string is configured, a
-    single entry containing ``ADDRESS_HOUSE`` and ``ADDRESS_STREET`` is
-    returned.
+    string is split on its first run of whitespace; the first token is
+    taken as the house number and the remainder (with whitespace
+    collapsed) is treated as the street name.  If no multi‑address
+    string is configured, a single entry containing ``ADDRESS_HOUSE``
+    and ``ADDRESS_STREET`` is returned.
+
+    The environment is only read once per process; the same list is
+    returned on every call and must not be modified.
     """
     multi = os.environ.get("TICKET_ADDRESSES")
     addresses: List[Dict[str, str]] = []
     if multi:
-        # split by semicolon or newline, and filter out empty strings
-        for raw in [part.strip() for part in multi.replace("\n", ";").split(";")]:
-            if not raw:
-                continue
-            parts = raw.split()
+        for raw in _ADDRESS_SEP_RE.split(multi):
+            parts = _WHITESPACE_RE.split(raw.strip(), maxsplit=1)
             if len(parts) < 2:
-                # Skip invalid entries
+                # Skip empty or invalid entries
                 continue
-            house = parts[0]
-            street = " ".join(parts[1:]).upper()
-            addresses.append({"house": house, "street": street})
+            house, street = parts
+            addresses.append(
+                {"house": house, "street": _WHITESPACE_RE.sub(" ", street).upper()}
+            )
     if not addresses:
         # fall back to single address from OATH_ADDRESS_HOUSE/STREET
         addresses.append({"house": ADDRESS_HOUSE, "street": ADDRESS_STREET})
@@ -96,8 +147,174 @@ def parse_addresses() -> List[Dict[str, str]]:
 # https://data.cityofnewyork.us for documentation.
 DATASET_URL = "https://data.cityofnewyork.us/resource/r78k-82m3.json"
 
+# Only the columns used by the notifier (plus the address fields needed
+# to match rows of a batched query back to an address) are requested.
+SELECTED_FIELDS = (
+    "ticket_number",
+    "violation_date",
+    "charge_1_code_description",
+    "hearing_status",
+    "violation_location_house",
+    "violation_location_street_name",
+)
+
+# Upper bound on the URL‑encoded length of the ``$where`` parameter.
+# Already‑known ticket numbers are pushed to the server in a ``NOT IN``
+# filter only while the encoded predicate stays below this, well inside
+# the common 8 KB request‑line limit; beyond it the unfiltered query is
+# used instead and the diff happens entirely client‑side.
+MAX_WHERE_LENGTH = 4000
+
+# Status codes with which the server may reject an over‑long query.
+# Such a request is retried once without the ``NOT IN`` filter.
+QUERY_TOO_LONG_STATUSES = (400, 414)
+
+# A single pooled session is shared by every request so that polling
+# several addresses reuses one keep‑alive connection (and one TLS
+# handshake) instead of opening a new connection per address.  Transient
+# rate‑limit and gateway errors are retried with a short backoff.
+SESSION = requests.Session()
+SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[429, 502, 503, 504],
+        ),
+    ),
+)
+
+
+def _soql_literal(value: str) -> str:
+    """Quote ``value`` as a SoQL string literal (``'`` is doubled)."""
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _address_clause(house: str, street: str) -> str:
+    """Return the SoQL predicate matching a single address."""
+    return (
+        f"violation_location_house={_soql_literal(house)} AND "
+        f"violation_location_street_name={_soql_literal(street)}"
+    )
+
+
+def _exclude_clause(exclude: Iterable[str]) -> str:
+    """Return an ``AND ticket_number NOT IN (...)`` suffix for ``exclude``.
+
+    An empty string is returned when there is nothing to exclude.
+    """
+    exclude = sorted(exclude)
+    if not exclude:
+        return ""
+    values = ",".join(_soql_literal(ticket) for ticket in exclude)
+    return f" AND ticket_number NOT IN ({values})"
 
-def fetch_tickets(house: str, street: str) -> List[Dict[str, str]]:
+
+@lru_cache(maxsize=64)
+def _address_where(addresses: Tuple[Tuple[str, str], ...]) -> str:
+    """Return the SoQL predicate matching any of ``addresses``.
+
+    ``addresses`` is a tuple of ``(house, street)`` pairs; several pairs
+    are combined with ``OR``.  The predicate only depends on the
+    configured addresses, so it is memoised; the excluded tickets, which
+    change from run to run, are kept out of the cache key.
+    """
+    if len(addresses) == 1:
+        return _address_clause(*addresses[0])
+    query = " OR ".join(
+        f"({_address_clause(house, street)})" for house, street in addresses
+    )
+    return f"({query})"
+
+
+def _build_url(addresses: Tuple[Tuple[str, str], ...], exclude: Iterable[str]) -> str:
+    """Return the fully encoded query URL for ``addresses``.
+
+    The ``NOT IN`` filter for ``exclude`` is left out if it would push
+    the encoded ``$where`` past :data:`MAX_WHERE_LENGTH`.
+    """
+    where = _address_where(addresses)
+    filtered = where + _exclude_clause(exclude)
+    if len(quote_plus(filtered)) <= MAX_WHERE_LENGTH:
+        where = filtered
+    params = {
+        "$select": ",".join(SELECTED_FIELDS),
+        "$where": where,
+        "$order": "violation_date DESC"
+    }
+    return f"{DATASET_URL}?{urlencode(params)}"
+
+
+def _get_records(
+    url: str, validators: Optional[Dict[str, Dict[str, str]]]
+) -> List[Dict[str, str]]:
+    """Issue a (conditional) dataset query and return the decoded rows.
+
+    ``validators`` maps a hash of a query URL to the ``ETag`` and
+    ``Last-Modified`` values the server returned for it.  When an entry
+    exists for ``url``, they are sent as ``If-None-Match`` and
+    ``If-Modified-Since``; a ``304 Not Modified`` reply means nothing has
+    changed, so an empty list is returned without parsing any body.
+    Otherwise ``validators`` is replaced in place by the validators of
+    the new response.  Only one entry is kept because each run issues a
+    single successful query, and the URL of the next run's query differs
+    whenever the excluded tickets change.
+    """
+    key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+    headers = {}
+    cached = validators.get(key, {}) if validators is not None else {}
+    if cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    if cached.get("last_modified"):
+        headers["If-Modified-Since"] = cached["last_modified"]
+
+    with SESSION.get(url, headers=headers, stream=True, timeout=30) as response:
+        if response.status_code == 304:
+            return []
+        response.raise_for_status()
+        if validators is not None:
+            validators.clear()
+            validators[key] = {
+                "etag": response.headers.get("ETag", ""),
+                "last_modified": response.headers.get("Last-Modified", ""),
+            }
+        # Read the (decompressed) body straight from the socket and parse
+        # the bytes directly, so no intermediate buffer or ``str`` copy is
+        # kept and orjson can work on UTF‑8 natively.
+        return _json_loads(response.raw.read(decode_content=True))
+
+
+def _query(
+    addresses: Tuple[Tuple[str, str], ...],
+    exclude: Iterable[str],
+    validators: Optional[Dict[str, Dict[str, str]]],
+) -> List[Dict[str, str]]:
+    """Query the dataset for ``addresses``, excluding known tickets.
+
+    If the server rejects the filtered query as too long (see
+    :data:`QUERY_TOO_LONG_STATUSES`), it is retried once without the
+    ``NOT IN`` filter.
+    """
+    url = _build_url(addresses, exclude)
+    try:
+        return _get_records(url, validators)
+    except requests.HTTPError as exc:
+        fallback_url = _build_url(addresses, ())
+        status = exc.response.status_code if exc.response is not None else None
+        if url == fallback_url or status not in QUERY_TOO_LONG_STATUSES:
+            raise
+        return _get_records(fallback_url, validators)
+
+
+def fetch_tickets(
+    house: str,
+    street: str,
+    exclude: Iterable[str] = (),
+    validators: Optional[Dict[str, Dict[str, str]]] = None,
+) -> List[Dict[str, str]]:
     """Fetch all DSNY OATH tickets for a given address.
 
     Parameters
@@ -106,37 +323,93 @@ def fetch_tickets(house: str, street: str) -> List[Dict[str, str]]:
         The house number of the property.
     street : str
         The street name as it appears in the DSNY dataset.
+    exclude : Iterable[str], optional
+        Ticket numbers that are already known.  They are filtered out on
+        the server so only candidate‑new tickets are downloaded.
+    validators : Dict[str, Dict[str, str]], optional
+        HTTP cache validators from the previous run, keyed by a hash of
+        the query URL.  When given, the request is conditional and the
+        mapping is updated in place with the validators of a new
+        response.
 
     Returns
     -------
     List[Dict[str, str]]
         A list of ticket records sorted by violation date descending.
+        Empty if the server reports that nothing has changed.
 
     Raises
     ------
     requests.HTTPError
         If the network request fails or returns a non‑200 status code.
     """
-    query = (
-        f"violation_location_house='{house}' AND "
-        f"violation_location_street_name='{street}'"
-    )
-    params = {
-        "$where": query,
-        "$order": "violation_date DESC"
+    return _query(((house, street),), exclude, validators)
+
+
+def fetch_tickets_batch(
+    addresses: List[Dict[str, str]],
+    exclude: Iterable[str] = (),
+    validators: Optional[Dict[str, Dict[str, str]]] = None,
+) -> List[Dict[str, str]]:
+    """Fetch DSNY OATH tickets for several addresses in one request.
+
+    All addresses are combined into a single ``$where`` predicate joined
+    with ``OR`` so that only one HTTP round‑trip is needed regardless of
+    how many addresses are monitored.  The flat response is then matched
+    back to the configured addresses using the ``violation_location_*``
+    fields.  With a single address this simply delegates to
+    :func:`fetch_tickets`.
+
+    Parameters
+    ----------
+    addresses : List[Dict[str, str]]
+        Addresses as returned by :func:`parse_addresses`.
+    exclude : Iterable[str], optional
+        Ticket numbers to filter out on the server; see
+        :func:`fetch_tickets`.
+    validators : Dict[str, Dict[str, str]], optional
+        HTTP cache validators; see :func:`fetch_tickets`.
+
+    Returns
+    -------
+    List[Dict[str, str]]
+        Ticket records sorted by violation date descending, each
+        annotated with an ``_address`` key naming the address it
+        belongs to.
+
+    Raises
+    ------
+    requests.HTTPError
+        If the network request fails or returns a non‑200 status code.
+    """
+    if len(addresses) == 1:
+        house = addresses[0]["house"]
+        street = addresses[0]["street"]
+        records = fetch_tickets(house, street, exclude, validators)
+        for rec in records:
+            rec["_address"] = f"{house} {street}"
+        return records
+
+    labels = {
+        (addr["house"], addr["street"]): f"{addr['house']} {addr['street']}"
+        for addr in addresses
     }
-    response = requests.get(DATASET_URL, params=params, timeout=30)
-    response.raise_for_status()
-    return response.json()
+    records = _query(tuple(labels), exclude, validators)
+
+    for rec in records:
+        house = rec.get("violation_location_house", "")
+        street = rec.get("violation_location_street_name", "")
+        rec["_address"] = labels.get((house, street), f"{house} {street}")
+    return records
 
 
 def load_known_tickets(path: Path) -> Set[str]:
-    """Load the set of known ticket numbers from a JSON file.
+    """Load the set of known ticket numbers from a text file.
 
     Parameters
     ----------
     path : Path
-        Path to a JSON file containing a list of ticket numbers.
+        Path to a file containing one ticket number per line.
 
     Returns
     -------
@@ -146,17 +419,11 @@ def load_known_tickets(path: Path) -> Set[str]:
     """
     if not path.exists():
         return set()
-    with path.open("r", encoding="utf‑8") as f:
-        try:
-            data = json.load(f)
-            # ensure unique values
-            return set(data)
-        except json.JSONDecodeError:
-            return set()
+    return set(path.read_text(encoding="utf-8").split("\n")) - {""}
 
 
 def save_known_tickets(path: Path, tickets: Iterable[str]) -> None:
-    """Write the list of ticket numbers back to disk.
+    """Write the ticket numbers back to disk, one per line.
 
     Parameters
     ----------
@@ -165,45 +432,162 @@ def save_known_tickets(path: Path, tickets: Iterable[str]) -> None:
     tickets : Iterable[str]
         Collection of ticket numbers to persist.
     """
-    with path.open("w", encoding="utf‑8") as f:
-        json.dump(sorted(tickets), f, indent=2)
+    path.write_text("".join(f"{ticket}\n" for ticket in sorted(tickets)), encoding="utf-8")
 
 
-def send_email(new_tickets: List[Dict[str, str]]) -> None:
+def load_validators(path: Path) -> Dict[str, Dict[str, str]]:
+    """Load the HTTP cache validators saved by a previous run.
+
+    Parameters
+    ----------
+    path : Path
+        Path to a JSON file mapping a query URL hash to its ``etag`` and
+        ``last_modified`` values.
+
+    Returns
+    -------
+    Dict[str, Dict[str, str]]
+        The stored validators, or an empty mapping if the file does not
+        exist or cannot be parsed.
+    """
+    if not path.exists():
+        return {}
+    try:
+        data = _json_loads(path.read_bytes())
+    except ValueError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def save_validators(path: Path, validators: Dict[str, Dict[str, str]]) -> None:
+    """Write the HTTP cache validators back to disk.
+
+    Parameters
+    ----------
+    path : Path
+        Path where the validators should be stored.
+    validators : Dict[str, Dict[str, str]]
+        Mapping of query URL hash to ``etag``/``last_modified`` values.
+    """
+    path.write_bytes(_json_dumps(validators))
+
+
+def load_last_fetch(path: Path) -> float:
+    """Return the time of the last successful query, as a Unix timestamp.
+
+    ``0.0`` is returned if the file does not exist or is malformed.
+    """
+    try:
+        return float(path.read_text(encoding="utf-8").strip())
+    except (OSError, ValueError):
+        return 0.0
+
+
+def save_last_fetch(path: Path, timestamp: float) -> None:
+    """Record ``timestamp`` as the time of the last successful query."""
+    path.write_text(f"{int(timestamp)}\n", encoding="utf-8")
+
+
+@dataclass(frozen=True, slots=True)
+class SmtpConfig:
+    """SMTP settings and notification addresses.
+
+    ``missing`` lists the environment variables that were unset or
+    invalid when the configuration was loaded; mail can only be sent
+    when it is empty.
+    """
+
+    server: str
+    port: int
+    username: str
+    # kept out of ``repr`` so the password never ends up in logs
+    password: str = field(repr=False)
+    from_email: str
+    to_email: str
+    missing: Tuple[str, ...] = ()
+
+
+def load_smtp_config() -> SmtpConfig:
+    """Read the SMTP configuration from the environment.
+
+    Returns
+    -------
+    SmtpConfig
+        The configuration, with ``missing`` naming any required variable
+        that is not set.  ``SMTP_PORT`` defaults to ``587`` and is
+        reported as missing if it is not a number.
+    """
+    values = {
+        name: os.environ.get(name, "")
+        for name in (
+            "SMTP_SERVER",
+            "SMTP_PORT",
+            "SMTP_USERNAME",
+            "SMTP_PASSWORD",
+            "FROM_EMAIL",
+            "TO_EMAIL",
+        )
+    }
+    values["SMTP_PORT"] = values["SMTP_PORT"] or "587"
+    missing = tuple(
+        name
+        for name, value in values.items()
+        if not (value.isdigit() if name == "SMTP_PORT" else value)
+    )
+    return SmtpConfig(
+        server=values["SMTP_SERVER"],
+        port=int(values["SMTP_PORT"]) if "SMTP_PORT" not in missing else 0,
+        username=values["SMTP_USERNAME"],
+        password=values["SMTP_PASSWORD"],
+        from_email=values["FROM_EMAIL"],
+        to_email=values["TO_EMAIL"],
+        missing=missing,
+    )
+
+
+# Environment variables are read once, when the module is imported.
+SMTP_CONFIG = load_smtp_config()
+
+
+def smtp_send(message: EmailMessage, config: SmtpConfig = SMTP_CONFIG) -> None:
+    """Deliver a message through an SMTP server using STARTTLS.
+
+    Parameters
+    ----------
+    message : EmailMessage
+        Fully composed message; its ``From`` and ``To`` headers determine
+        the envelope sender and recipients.
+    config : SmtpConfig, optional
+        Server and credentials to use; defaults to :data:`SMTP_CONFIG`.
+    """
+    with smtplib.SMTP(config.server, config.port) as smtp:
+        # use TLS if supported
+        smtp.starttls()
+        smtp.login(config.username, config.password)
+        smtp.send_message(message)
+
+
+def send_email(
+    new_tickets: List[Dict[str, str]], config: SmtpConfig = SMTP_CONFIG
+) -> None:
     """Send an email notifying about new tickets.
 
     Parameters
     ----------
     new_tickets : List[Dict[str, str]]
         List of ticket records that have not been seen before.
+    config : SmtpConfig, optional
+        SMTP configuration and recipient details; defaults to
+        :data:`SMTP_CONFIG`, which is read from the environment variables
+        described in the module docstring.
 
-    The SMTP configuration and recipient details are read from
-    environment variables as described in the module docstring.  If any
-    required variable is missing, this function prints an error and
-    returns without sending mail.
+    If any required variable is missing, this function prints an error
+    and returns without sending mail.
     """
-    smtp_server = os.environ.get("SMTP_SERVER")
-    smtp_port = os.environ.get("SMTP_PORT")
-    smtp_username = os.environ.get("SMTP_USERNAME")
-    smtp_password = os.environ.get("SMTP_PASSWORD")
-    from_email = os.environ.get("FROM_EMAIL")
-    to_email = os.environ.get("TO_EMAIL")
-
-    missing = [
-        name
-        for name, value in [
-            ("SMTP_SERVER", smtp_server),
-            ("SMTP_PORT", smtp_port),
-            ("SMTP_USERNAME", smtp_username),
-            ("SMTP_PASSWORD", smtp_password),
-            ("FROM_EMAIL", from_email),
-            ("TO_EMAIL", to_email),
-        ]
-        if not value
-    ]
-    if missing:
+    if config.missing:
         print(
-            f"Cannot send email: missing environment variables: {', '.join(missing)}"
+            "Cannot send email: missing environment variables: "
+            f"{', '.join(config.missing)}"
         )
         return
 
@@ -217,35 +601,36 @@ def send_email(new_tickets: List[Dict[str, str]]) -> None:
     if len(addresses) == 1:
         addr_str = next(iter(addresses))
         subject = f"New DSNY OATH tickets for {addr_str}"
-        lines = [f"The following new DSNY OATH tickets have been issued for {addr_str}:", ""]
+        header = f"The following new DSNY OATH tickets have been issued for {addr_str}:"
     else:
         subject = "New DSNY OATH tickets detected"
-        lines = ["The following new DSNY OATH tickets have been issued:", ""]
+        header = "The following new DSNY OATH tickets have been issued:"
+    # Write the body straight into a buffer rather than collecting the
+    # lines in a list and joining them afterwards
+    buf = io.StringIO()
+    buf.write(header)
+    buf.write("\n\n")
     for ticket in new_tickets:
         violation_date = ticket.get("violation_date", "Unknown Date")
         description = ticket.get("charge_1_code_description", "")
         status = ticket.get("hearing_status", "")
         ticket_number = ticket.get("ticket_number", "")
         addr = ticket.get("_address", f"{ADDRESS_HOUSE} {ADDRESS_STREET}")
-        lines.append(
-            f"• {addr}: Ticket {ticket_number} on {violation_date[:10]} – {description} (Status: {status})"
+        buf.write(
+            f"• {addr}: Ticket {ticket_number} on {violation_date[:10]} – {description} (Status: {status})\n"
         )
-    body = "\n".join(lines)
+    body = buf.getvalue()
 
-    message = MIMEText(body)
+    message = EmailMessage()
     message["Subject"] = subject
-    message["From"] = from_email
-    message["To"] = to_email
+    message["From"] = config.from_email
+    message["To"] = config.to_email
+    message.set_content(body)
 
     # Attempt to send the email via SMTP
     try:
-        port = int(smtp_port)
-        with smtplib.SMTP(smtp_server, port) as server:
-            # use TLS if supported
-            server.starttls()
-            server.login(smtp_username, smtp_password)
-            server.sendmail(from_email, [to_email], message.as_string())
-        print(f"Notification email sent to {to_email} with {len(new_tickets)} new tickets.")
+        smtp_send(message, config)
+        print(f"Notification email sent to {config.to_email} with {len(new_tickets)} new tickets.")
     except Exception as exc:
         print(f"Failed to send email: {exc}")
 
@@ -258,45 +643,68 @@ def main() -> None:
     the updated set of known ticket numbers.
     """
     repo_root = Path(__file__).resolve().parent
-    known_file = repo_root / "known_tickets.json"
-
-    # Load previously known ticket numbers
+    known_file = repo_root / "known_tickets.txt"
+    etag_file = repo_root / "etag.json"
+    last_fetch_file = repo_root / "last_fetch.txt"
+
+    # Skip the run entirely if the dataset was queried recently enough
+    if MIN_INTERVAL_SECONDS > 0:
+        elapsed = time.time() - load_last_fetch(last_fetch_file)
+        if elapsed < MIN_INTERVAL_SECONDS:
+            print(
+                f"Last check was {int(elapsed)} seconds ago "
+                f"(minimum interval {MIN_INTERVAL_SECONDS}); skipping."
+            )
+            return
+
+    # Load previously known ticket numbers and HTTP cache validators
     known_tickets = load_known_tickets(known_file)
+    legacy_file = repo_root / "known_tickets.json"
+    if not known_file.exists() and legacy_file.exists():
+        # carry over tickets recorded by older versions as a JSON list
+        try:
+            known_tickets = set(_json_loads(legacy_file.read_bytes()))
+        except ValueError:
+            pass
+    previous_validators = load_validators(etag_file)
+    validators = dict(previous_validators)
 
     # Collect current records across all configured addresses
     current_records: List[Dict[str, str]] = []
     addresses = parse_addresses()
-    for addr in addresses:
-        house = addr["house"]
-        street = addr["street"]
-        try:
-            records = fetch_tickets(house, street)
-        except Exception as e:
-            print(f"Error fetching tickets for {house} {street}: {e}")
+    # A single batched query covers every configured address
+    try:
+        current_records = fetch_tickets_batch(
+            addresses, exclude=known_tickets, validators=validators
+        )
+    except Exception as e:
+        labels = "; ".join(f"{a['house']} {a['street']}" for a in addresses)
+        print(f"Error fetching tickets for {labels}: {e}")
+    else:
+        # Only touch the file when the server handed out new validators,
+        # so an unchanged dataset does not produce a new commit
+        if validators != previous_validators:
+            save_validators(etag_file, validators)
+        if MIN_INTERVAL_SECONDS > 0:
+            save_last_fetch(last_fetch_file, time.time())
+
+    # Split the records into current ticket numbers and new records in a
+    # single pass, preserving the server's ordering
+    current_ticket_numbers: Set[str] = set()
+    new_records: List[Dict[str, str]] = []
+    for record in current_records:
+        ticket_number = record.get("ticket_number")
+        if not ticket_number:
             continue
-        # annotate each record with its address for later use
-        for rec in records:
-            rec["_address"] = f"{house} {street}"
-        current_records.extend(records)
+        current_ticket_numbers.add(ticket_number)
+        if ticket_number not in known_tickets:
+            new_records.append(record)
 
-    # Compute set of ticket numbers from all addresses
-    current_ticket_numbers: Set[str] = {
-        record.get("ticket_number")
-        for record in current_records
-        if record.get("ticket_number")
-    }
-    new_ticket_numbers = current_ticket_numbers - known_tickets
-
-    if new_ticket_numbers:
-        # Build list of new ticket records preserving order
-        new_records = [
-            record
-            for record in current_records
-            if record.get("ticket_number") in new_ticket_numbers
-        ]
+    if new_records:
         send_email(new_records)
-        # Update stored set
-        save_known_tickets(known_file, current_ticket_numbers)
+        # Update stored set.  Known tickets are filtered out server-side,
+        # so merge rather than replace to keep them on record.
+        save_known_tickets(known_file, known_tickets | current_ticket_numbers)
     else:
         print("No new tickets found.")
 